@@ -4,6 +4,7 @@ from typing import Callable
 
 import napari
 import numpy as np
+import pytest
 
 from napari_roi_manager import QRoiManager
 
@@ -36,6 +37,22 @@ def test_many_operations(make_napari_viewer: Callable[[], napari.Viewer]):
     roi_manager.set_show_all(True)
 
 
+def test_select(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    for i in range(3):
+        roi_manager.register(_rectangle(i, i), shape_type="rectangle")
+    roi_manager.select(1)
+    assert roi_manager._layer.selected_data == {1}
+    roi_manager.select(np.int64(2))
+    assert roi_manager._layer.selected_data == {2}
+    roi_manager.select([0, 1])
+    assert roi_manager._layer.selected_data == {0, 1}
+    with pytest.raises(TypeError):
+        roi_manager.select("12")
+    assert roi_manager._layer.selected_data == {0, 1}
+
+
 def test_to_shapes(make_napari_viewer: Callable[[], napari.Viewer]):
     viewer = make_napari_viewer()
     roi_manager = QRoiManager(viewer)
@@ -94,7 +111,33 @@ def test_remove_during_not_show_all(make_napari_viewer: Callable[[], napari.View
     assert roi_manager._roilist.rowCount() == 2
 
 
-def test_read_write(make_napari_viewer: Callable[[], napari.Viewer]):
+def test_remove_registered_while_hidden(
+    make_napari_viewer: Callable[[], napari.Viewer],
+):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    roi_manager.register(_rectangle(0, 0), shape_type="rectangle")
+    roi_manager.set_show_all(False)
+    roi_manager.register(_rectangle(6, 6), shape_type="ellipse")
+    hidden = roi_manager._layer._hidden_shapes
+    assert len(hidden.features) == hidden.len() == 2
+    roi_manager._roilist.selectRow(1)
+    roi_manager._btns._remove_roi_btn.click()
+    assert len(hidden.features) == hidden.len() == 1
+    assert hidden.shape_type.tolist() == ["rectangle"]
+    assert roi_manager._roilist.rowCount() == 1
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_read_write(
+    make_napari_viewer: Callable[[], napari.Viewer], monkeypatch, backend: str
+):
+    from napari_roi_manager.layers import _layer
+
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(_layer, "orjson", None)
     viewer = make_napari_viewer()
     roi_manager = QRoiManager(viewer)
     roi_manager.load_roiset(
@@ -103,5 +146,256 @@ def test_read_write(make_napari_viewer: Callable[[], napari.Viewer]):
     roi_manager.load_roiset(
         path=Path(__file__).parent / "_test_roiset.json", append=True
     )
+    assert roi_manager._layer.roi_count() == 10
+    assert roi_manager._roilist.rowCount() == 10
+    assert roi_manager._layer.shape_type[3:6] == ["ellipse", "ellipse", "rectangle"]
+    assert roi_manager._layer.features["id"].tolist() == list(range(10))
+    rois = roi_manager._layer.get_roi_data()
     with tempfile.TemporaryDirectory() as tmpdir:
         roi_manager.save_roiset(path=Path(tmpdir) / "test_save_roiset.json")
+        roi_manager.load_roiset(
+            path=Path(tmpdir) / "test_save_roiset.json", append=False
+        )
+    assert roi_manager._layer.roi_count() == 10
+    loaded = roi_manager._layer.get_roi_data()
+    assert loaded.shape_type == rois.shape_type
+    assert loaded.names == rois.names
+    for a, b in zip(loaded.data, rois.data):
+        np.testing.assert_allclose(a, b)
+
+    # arrays that are not C-contiguous
+    layer = roi_manager._layer
+    data = [np.asfortranarray(rois.data[0]), rois.data[1][::-1]]
+    monkeypatch.setattr(
+        layer, "get_roi_data", lambda: _layer.RoiData(data, rois.shape_type[:2])
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        layer.write_json(Path(tmpdir) / "test_save_roiset.json")
+        js = _layer._read_json(Path(tmpdir) / "test_save_roiset.json")
+    for a, b in zip(_layer.RoiData.from_json_dict(js).data, data):
+        np.testing.assert_allclose(a, b)
+
+
+def test_roi_data_json_roundtrip():
+    from napari_roi_manager.layers._dataclasses import RoiData
+
+    data = [_rectangle(0, 0), np.array([[0.0, 1.0], [2.0, 3.0]]), _rectangle(3, 4)]
+    rois = RoiData(data, ["rectangle", "line", "ellipse"], ["a", "b", "c"])
+    js = rois.to_json_dict()
+    assert js["data"] == [d.tolist() for d in data]
+    out = RoiData.from_json_dict(js)
+    assert out.shape_type == rois.shape_type
+    assert out.names == rois.names
+    for d0, d1 in zip(out.data, data):
+        np.testing.assert_array_equal(d0, d1)
+
+
+def test_hidden_shapes_remove_keeps_selection():
+    import pandas as pd
+
+    from napari_roi_manager.layers._dataclasses import HiddenShapes
+
+    hidden = HiddenShapes()
+    hidden.update(
+        data=[_rectangle(i, i) for i in range(5)],
+        features=pd.DataFrame({"id": np.arange(5)}),
+        shape_type=["rectangle"] * 5,
+        selected_data={1, 3, 4},
+        current_item=None,
+    )
+    hidden.remove([0, 3])
+    assert hidden.len() == 3
+    assert hidden.features["id"].tolist() == [1, 2, 4]
+    assert hidden.selected_data.tolist() == [0, 2]
+    hidden.pop(0)
+    assert hidden.selected_data.tolist() == [1]
+    with pytest.raises(IndexError):
+        hidden.remove([0, 5])
+    assert hidden.len() == len(hidden.shape_type) == len(hidden.features) == 2
+
+
+def test_show_all_keeps_shape_types(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    layer = roi_manager._layer
+    roi_manager.register(_rectangle(0, 0), shape_type="rectangle")
+    roi_manager.register(_rectangle(6, 6), shape_type="ellipse")
+    roi_manager.add(_rectangle(9, 9), shape_type="ellipse")
+    roi_manager.set_show_all(False)
+    assert layer.shape_type == ["ellipse"]
+    assert layer._current_item == 0
+    roi_manager.set_show_all(True)
+    assert layer.shape_type == ["rectangle", "ellipse", "ellipse"]
+    assert layer.features["id"].tolist() == [0, 1, 2]
+    assert layer.roi_count() == 2
+
+
+def test_show_all_toggle_when_empty(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    layer = roi_manager._layer
+    roi_manager.add(_rectangle(0, 0), shape_type="rectangle")
+    layer.show_all = False
+    layer.selected_data = {0}
+    layer.remove_selected()
+    layer.show_all = True
+    layer.show_all = False
+    roi_manager.register(_rectangle(3, 3), shape_type="rectangle")
+    roi_manager.add(_rectangle(6, 6), shape_type="rectangle")
+    layer.show_all = True
+    assert layer._current_item == 1
+    assert layer.roi_count() == 1
+
+
+def test_specify(make_napari_viewer: Callable[[], napari.Viewer]):
+    from napari_roi_manager.widgets._dialogs import QSpecifyDialog
+
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    roi_manager.register(_rectangle(0, 0), shape_type="ellipse")
+    dlg = QSpecifyDialog(roi_manager._layer, roi_manager)
+    dlg.width_input.setText("10")
+    dlg.x_input.setText("4")
+    dlg.height_input.setText("")  # intermediate input keeps the last value
+    dlg.accept()
+    layer = roi_manager._layer
+    assert layer.shape_type == ["ellipse", "rectangle"]
+    assert layer._current_item == 1
+    np.testing.assert_allclose(
+        layer.data[1], [[128, 4], [384, 4], [384, 14], [128, 14]]
+    )
+
+
+def test_rename(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    roi_manager.register(_rectangle(0, 0), shape_type="rectangle")
+    roi_manager.register(_rectangle(6, 6), shape_type="ellipse")
+    roilist = roi_manager._roilist
+    assert roilist.get_column("type") == ["rectangle", "ellipse"]
+    model = roilist.model()
+    model.setData(model.index(1, 0), "my-roi")
+    assert roilist.get_column("name") == ["ROI-0000", "my-roi"]
+    assert roi_manager._layer.features["name"].tolist() == ["ROI-0000", "my-roi"]
+    roi_manager.set_text_feature_name(1)
+    assert roi_manager._layer.text.string.format == "{name}"
+    model.setData(model.index(0, 0), "first")
+    assert roi_manager._layer.features["name"].tolist() == ["first", "my-roi"]
+    roi_manager.add(_rectangle(9, 9), shape_type="rectangle")  # not registered
+    model.setData(model.index(1, 0), "second")
+    assert roi_manager._layer.features["name"].tolist()[:2] == ["first", "second"]
+    roi_manager._layer.remove_selected()
+    texts = roi_manager._layer.text.values.tolist()
+    with roi_manager.batch_rename():
+        model.setData(model.index(0, 0), "a")
+        model.setData(model.index(1, 0), "b")
+        assert roi_manager._layer.text.values.tolist() == texts
+    assert roi_manager._layer.text.values.tolist() == ["a", "b"]
+
+
+def test_rename_while_hidden(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    roi_manager.register(_rectangle(0, 0), shape_type="rectangle")
+    roi_manager.set_text_feature_name(1)
+    roi_manager.set_show_all(False)
+    roi_manager.register(_rectangle(6, 6), shape_type="rectangle")
+    model = roi_manager._roilist.model()
+    model.setData(model.index(1, 0), "hidden-roi")
+    hidden = roi_manager._layer._hidden_shapes
+    assert hidden.features["name"].tolist() == ["ROI-0000", "hidden-roi"]
+    roi_manager.set_show_all(True)
+    assert roi_manager._layer.features["name"].tolist()[:2] == [
+        "ROI-0000",
+        "hidden-roi",
+    ]
+
+
+def test_register_after_initialize_while_hidden(
+    make_napari_viewer: Callable[[], napari.Viewer],
+):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    layer = roi_manager._layer
+    roi_manager.register(_rectangle(0, 0), shape_type="rectangle")
+    roi_manager.register(_rectangle(3, 3), shape_type="rectangle")
+    roi_manager.set_text_feature_name(1)
+    roi_manager.set_show_all(False)
+    layer._initialize_layer()
+    roi_manager._roilist.removeRows(range(roi_manager._roilist.rowCount()))
+    hidden = layer._hidden_shapes
+    assert hidden.len() == len(hidden.features) == 0
+    roi_manager.register(_rectangle(6, 6), shape_type="ellipse")
+    assert hidden.len() == len(hidden.features) == 1
+    model = roi_manager._roilist.model()
+    model.setData(model.index(0, 0), "new")
+    assert hidden.features["name"].tolist() == ["new"]
+
+
+def test_remove_rows(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    for i in range(6):
+        roi_manager.register(_rectangle(i, i), shape_type="rectangle")
+    roi_manager.remove([0, 1, 3, 4])
+    assert roi_manager._roilist.get_column("name") == ["ROI-0002", "ROI-0005"]
+    assert roi_manager._layer.roi_count() == 2
+
+
+def test_selection_changed(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    for i in range(3):
+        roi_manager.register(_rectangle(i, i), shape_type="rectangle")
+    roilist = roi_manager._roilist
+    emitted = []
+    roilist.selected.connect(emitted.append)
+    roilist.selectRow(2)
+    roilist._selection_changed()  # same selection
+    assert emitted == [{2}]
+    roilist.removeRows([0])
+    roilist._selection_changed()
+    assert emitted[-1] == {1}
+
+
+def test_roi_added_event(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    events = []
+    batches = []
+    roi_manager._layer.events.roi_added.connect(events.append)
+    roi_manager._layer.events.rois_added.connect(batches.append)
+    roi_manager.register(_rectangle(0, 0), shape_type="ellipse")
+    assert [(ev.index, ev.shape_type) for ev in events] == [(0, "ellipse")]
+    assert batches[-1].indices == [0]
+    assert batches[-1].shape_types == ["ellipse"]
+    roi_manager.load_roiset(path=Path(__file__).parent / "_test_roiset.json")
+    assert [ev.index for ev in events] == list(range(6))
+    assert len(batches) == 2
+    assert batches[-1].indices == list(range(1, 6))
+    assert batches[-1].shape_types == [ev.shape_type for ev in events[1:]]
+
+
+def test_add_after_throttled_selection(
+    make_napari_viewer: Callable[[], napari.Viewer], qtbot
+):
+    viewer = make_napari_viewer()
+    roi_manager = QRoiManager(viewer)
+    layer = roi_manager._layer
+    for i in range(3):
+        roi_manager.register(_rectangle(i, i), shape_type="rectangle")
+    roi_manager._roilist.selectRow(0)
+    roi_manager._roilist.selectRow(1)
+    layer.add(_rectangle(9, 9), shape_type="rectangle")
+    qtbot.wait(120)
+    assert layer.nshapes == 4
+    assert layer._current_item == 3
+    assert layer.roi_count() == roi_manager._roilist.rowCount() == 3
+    roi_manager.register()
+    assert layer.roi_count() == roi_manager._roilist.rowCount() == 4
+
+
+def test_open_as_plugin(make_napari_viewer: Callable[[], napari.Viewer]):
+    viewer = make_napari_viewer()
+    _, widget = viewer.window.add_plugin_dock_widget("napari-roi-manager")
+    assert isinstance(widget, QRoiManager)
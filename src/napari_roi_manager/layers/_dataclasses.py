@@ -1,25 +1,47 @@
 from __future__ import annotations
 
+import sys
+from collections.abc import Iterable
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-import pandas as pd
 from numpy.typing import NDArray
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-@dataclass
+# `slots` argument is only available in Python >= 3.10
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+_SHAPE_TYPE_DTYPE = np.dtype("<U16")
+
+
+def _empty_features() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame()
+
+
+def _empty_shape_type() -> NDArray[np.str_]:
+    return np.empty(0, dtype=_SHAPE_TYPE_DTYPE)
+
+
+@dataclass(**_SLOTS)
 class HiddenShapes:
     data: list[NDArray[np.number]] = field(default_factory=list)
-    shape_type: list[str] = field(default_factory=list)
-    selected_data: set[int] = field(default_factory=set)
-    features: pd.DataFrame = field(default_factory=lambda: pd.DataFrame())
+    shape_type: NDArray[np.str_] = field(default_factory=_empty_shape_type)
+    selected_data: NDArray[np.intp] = field(
+        default_factory=lambda: np.empty(0, dtype=np.intp)
+    )
+    features: pd.DataFrame = field(default_factory=_empty_features)
     current_item: int | None = None
     display_text: bool = False
 
     def clear(self):
         self.data.clear()
-        self.shape_type.clear()
+        self.shape_type = _empty_shape_type()
+        self.features = self.features.iloc[:0]
+        self.selected_data = self.selected_data[:0]
         self.current_item = None
 
     def update(
@@ -27,36 +49,83 @@ class HiddenShapes:
         data: list[NDArray[np.number]],
         features: pd.DataFrame,
         shape_type: list[str],
-        selected_data: set[int],
+        selected_data: Iterable[int],
         current_item: int | None,
         display_text: bool = False,
     ):
         self.data = data
         self.features = features
-        self.shape_type = shape_type
-        self.selected_data = selected_data
+        self.shape_type = np.asarray(shape_type, dtype=_SHAPE_TYPE_DTYPE)
+        self.selected_data = np.array(sorted(selected_data), dtype=np.intp)
         self.current_item = current_item
         self.display_text = display_text
 
+    def append(self, data: NDArray[np.number], shape_type: str, name: str = "") -> None:
+        import pandas as pd
+
+        row = {"id": [len(self.data)]}
+        if "name" in self.features:
+            row["name"] = [name]
+        self.features = pd.concat([self.features, pd.DataFrame(row)], ignore_index=True)
+        self.data.append(data)
+        self.shape_type = np.append(self.shape_type, shape_type)
+
     def pop(self, idx: int) -> tuple[NDArray[np.number], str]:
-        out = self.data.pop(idx), self.shape_type.pop(idx)
-        self.features = self.features.drop(self.features.index[idx])
-        self.selected_data.discard(idx)
+        if idx < 0:
+            idx += len(self.data)
+        # features are dropped first so that an invalid index changes nothing
+        self.features = self._drop_feature_rows([idx])
+        out = self.data.pop(idx), str(self.shape_type[idx])
+        self.shape_type = np.delete(self.shape_type, idx)
+        self._drop_selection([idx])
         return out
 
+    def remove(self, indices: Iterable[int]) -> None:
+        """Remove all the shapes at the given indices at once."""
+        indices = sorted(set(indices))
+        if indices and not (indices[0] >= 0 and indices[-1] < len(self.data)):
+            raise IndexError(f"Indices {indices} out of range.")
+        features = self._drop_feature_rows(indices)
+        mask = np.ones(len(self.data), dtype=bool)
+        mask[indices] = False
+        self.features = features
+        self.data = [d for d, keep in zip(self.data, mask) if keep]
+        self.shape_type = self.shape_type[mask]
+        self._drop_selection(indices)
+
+    def _drop_feature_rows(self, indices: list[int]) -> pd.DataFrame:
+        keep = np.delete(np.arange(len(self.features)), indices)
+        return self.features.take(keep).reset_index(drop=True)
+
+    def _drop_selection(self, indices: list[int]) -> None:
+        # `indices` must be sorted. Selected indices above the removed ones are
+        # shifted down so that they keep pointing to the same shapes.
+        if not indices:
+            return
+        sel = self.selected_data
+        removed = np.asarray(indices, dtype=np.intp)
+        pos = np.searchsorted(removed, sel)
+        hit = removed[np.minimum(pos, removed.size - 1)] == sel
+        self.selected_data = sel[~hit] - pos[~hit]
+
     def len(self) -> int:
         return len(self.data)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class RoiData:
     data: list[NDArray[np.number]] = field(default_factory=list)
     shape_type: list[str] = field(default_factory=list)
-    names: list[str] | None = field(default_factory=lambda: None)
+    names: list[str] | None = None
+
+    def to_json_dict(self, tolist: bool = True) -> dict[str, Any]:
+        """
+        Convert RoiData to a JSON serializable dictionary.
 
-    def to_json_dict(self) -> dict[str, Any]:
-        """Convert RoiData to a JSON serializable dictionary."""
-        data = [d.tolist() for d in self.data]
+        If `tolist` is false, the arrays are kept as is for encoders that can
+        serialize NumPy arrays directly.
+        """
+        data = _batched_tolist(self.data) if tolist else list(self.data)
         out = {"data": data, "shape_type": self.shape_type}
         if self.names is not None:
             out["names"] = self.names
@@ -65,7 +134,37 @@ class RoiData:
     @classmethod
     def from_json_dict(cls, js: dict[str, Any]) -> RoiData:
         """Create RoiData from a JSON serializable dictionary."""
-        data = [np.array(d) for d in js["data"]]
+        data = _batched_asarray(js["data"])
         shape_type = js["shape_type"]
         names = js.get("names")
         return RoiData(data, shape_type=shape_type, names=names)
+
+
+def _batched_asarray(nested: list[list]) -> list[NDArray[np.float64]]:
+    """Convert nested lists to arrays, calling `asarray` once per group of shapes."""
+    groups: dict[tuple[int, int], list[int]] = {}
+    for i, each in enumerate(nested):
+        key = (len(each), len(each[0]) if each else 0)
+        groups.setdefault(key, []).append(i)
+    out: list[NDArray[np.float64]] = [None] * len(nested)
+    for indices in groups.values():
+        arr = np.asarray([nested[i] for i in indices], dtype=np.float64)
+        for i, each in zip(indices, arr):
+            out[i] = each
+    return out
+
+
+def _batched_tolist(arrays: list[NDArray[np.number]]) -> list[list]:
+    """Convert arrays to nested lists, calling `tolist` once per group of shapes."""
+    groups: dict[tuple[tuple[int, ...], np.dtype], list[int]] = {}
+    for i, arr in enumerate(arrays):
+        groups.setdefault((arr.shape, arr.dtype), []).append(i)
+    out: list[list] = [None] * len(arrays)
+    for indices in groups.values():
+        if len(indices) == 1:
+            out[indices[0]] = arrays[indices[0]].tolist()
+            continue
+        stacked = np.stack([arrays[i] for i in indices]).tolist()
+        for i, each in zip(indices, stacked):
+            out[i] = each
+    return out
@@ -2,30 +2,56 @@ from __future__ import annotations
 
 import json
 import weakref
-from contextlib import nullcontext
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, nullcontext
 from enum import Enum
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
 from napari.layers import Shapes
 from napari.layers.base import ActionType
 from napari.utils.events import Event
 
 from napari_roi_manager.layers._dataclasses import HiddenShapes, RoiData
 
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
 if TYPE_CHECKING:
+    import pandas as pd
+
     from napari_roi_manager.widgets._roi_manager import QRoiManager
 
 
+_FACE_COLOR = np.array([0.0, 0.0, 0.0, 0.0], dtype=np.float32)
+_EDGE_COLOR = np.array([1.0, 1.0, 0.0, 1.0], dtype=np.float32)
+_FACE_COLOR.flags.writeable = False
+_EDGE_COLOR.flags.writeable = False
+
+
 class TextFeatureName(Enum):
     ID = "id"
     NAME = "name"
 
 
 class RoiManagerLayer(Shapes):
-    """Layer for managing ROIs."""
+    """
+    Layer for managing ROIs.
+
+    Events
+    ------
+    roi_added
+        Emitted for each registered ROI with its `index` and `shape_type`.
+    rois_added
+        Emitted once per batch of registered ROIs, such as those loaded from a
+        file, with the `indices` and `shape_types` of all of them.
+    roi_removed
+        Emitted with the `indices` of the removed ROIs.
+    """
 
     _type_string = "shapes"
 
@@ -33,15 +59,19 @@ class RoiManagerLayer(Shapes):
         self._current_item: int | None = None
         # the last current_item before unchecking "show all"
         self._show_all = True
+        self._batching = False
         self._text_feature_name = TextFeatureName.ID
         self._hidden_shapes = HiddenShapes()
+        # read-only buffer of sequential ids, grown geometrically on demand
+        self._id_buf = np.arange(16, dtype=np.uint32)
+        self._id_buf.flags.writeable = False
         if roi_manager is not None:
             self._roi_manager_ref = weakref.ref(roi_manager)
         else:
             self._roi_manager_ref = lambda: None
 
-        kwargs["face_color"] = [0.0, 0.0, 0.0, 0.0]
-        kwargs["edge_color"] = [1.0, 1.0, 0.0, 1.0]
+        kwargs["face_color"] = _FACE_COLOR
+        kwargs["edge_color"] = _EDGE_COLOR
         kwargs["ndim"] = 2
         kwargs["text"] = {
             "string": "{id}",
@@ -49,10 +79,11 @@ class RoiManagerLayer(Shapes):
             "visible": False,
             "size": 9,
         }
-        kwargs["features"] = {"id": np.arange(0, dtype=np.uint32)}
+        kwargs["features"] = {"id": self._sequential_ids(0)}
         super().__init__(*args, **kwargs)
         self.events.add(
             roi_added=Event,
+            rois_added=Event,
             roi_removed=Event,
         )
 
@@ -63,41 +94,76 @@ class RoiManagerLayer(Shapes):
     def _on_data_change(self, ev):
         if ev.action is ActionType.ADDING:
             self._remove_current()
-            if not self.show_all:
+            if not self.show_all and (n := self.nshapes) > 0:
+                # usually only the last registered ROI is left here
                 with self.events.data.blocker():
-                    self.selected_data = set(range(self.nshapes))
+                    self.selected_data = {0} if n == 1 else set(range(n))
                     super().remove_selected()
-            feature_defaults = {"id": self.nshapes}
+            nshapes = self.nshapes
+            feature_defaults = {"id": nshapes}
             if "name" in self.features:
-                feature_defaults["name"] = f"ROI-{self.nshapes:>04}"
+                feature_defaults["name"] = _roi_name(nshapes)
             self.feature_defaults = feature_defaults
         elif ev.action is ActionType.ADDED:
             idx = ev.data_indices[0]
             if idx < 0:
                 idx = self.nshapes + idx
             self._current_item = idx
-            self.selected_data = {idx}
-            self._relabel_feature_id()
+            if not self._batching:
+                self._set_selected({idx})
+                self._relabel_feature_id()
 
         elif ev.action is ActionType.REMOVING:
             pass
         elif ev.action is ActionType.REMOVED:
-            if self._current_item is None:
-                pass  # do nothing
-            elif self._current_item in ev.data_indices:
-                self._current_item = None
-            else:
-                n_smaller = sum(
-                    int(idx < self._current_item) for idx in ev.data_indices
-                )
-                self._current_item -= n_smaller
-            self._relabel_feature_id()
+            if self._current_item is not None:
+                n_smaller, removed = _count_smaller(ev.data_indices, self._current_item)
+                if removed:
+                    self._current_item = None
+                else:
+                    self._current_item -= n_smaller
+            if not self._batching:
+                self._relabel_feature_id()
 
     def _relabel_feature_id(self):
         df = self.features
-        df["id"] = np.arange(df.shape[0], dtype=np.uint32)
+        ids = self._sequential_ids(df.shape[0])
+        if "id" in df and np.array_equal(df["id"].to_numpy(), ids):
+            return
+        df["id"] = ids
         self.features = df
 
+    def _set_selected(self, indices: set[int]):
+        """Update the selection only if it changes, to avoid redundant events."""
+        if self.selected_data != indices:
+            self.selected_data = indices
+
+    def _get_shape(self, idx: int) -> tuple[np.ndarray, str]:
+        """Get the data and shape type of one shape without listing all of them."""
+        # NOTE: `self.data` and `self.shape_type` build lists of all the shapes.
+        shape = self._data_view.shapes[idx]
+        return shape.data, shape.name
+
+    @contextmanager
+    def _batched_updates(self) -> Iterator[None]:
+        """Defer selection and id updates of data events to the end of the block."""
+        if self._batching:
+            yield
+            return
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+            self._relabel_feature_id()
+
+    def _sequential_ids(self, n: int) -> np.ndarray:
+        """Return a read-only view of ids 0, 1, ..., n - 1."""
+        if n > self._id_buf.size:
+            self._id_buf = np.arange(max(n, self._id_buf.size * 2), dtype=np.uint32)
+            self._id_buf.flags.writeable = False
+        return self._id_buf[:n]
+
     def _remove_current(self):
         if self._current_item is not None:
             with self.events.data.blocker():
@@ -106,30 +172,64 @@ class RoiManagerLayer(Shapes):
 
     def register_roi(self):
         """Register the current ROI to the manager."""
-        if self._current_item is not None:
-            self.events.roi_added(
-                index=self._current_item,
-                shape_type=self.shape_type[self._current_item],
-            )
+        if (idx := self._current_item) is not None:
+            data, shape_type = self._get_shape(idx)
+            self._emit_roi_added([idx], [shape_type])
             if not self.show_all:
-                self._hidden_shapes.data.append(self.data[self._current_item])
-                self._hidden_shapes.shape_type.append(
-                    self.shape_type[self._current_item]
-                )
+                self._hidden_shapes.append(data, shape_type, name=_roi_name(idx))
             else:
-                self.selected_data = set()
+                self._set_selected(set())
         else:
-            self.selected_data = set()
+            self._set_selected(set())
         self._current_item = None
         self.refresh()
 
+    def _emit_roi_added(self, indices: list[int], shape_types: list[str]):
+        self.events.rois_added(indices=indices, shape_types=shape_types)
+        # per-ROI events are only emitted if someone listens to them
+        if self.events.roi_added.callbacks:
+            for index, shape_type in zip(indices, shape_types):
+                self.events.roi_added(index=index, shape_type=shape_type)
+
+    def rename_roi(self, index: int, name: str, refresh: bool = True) -> None:
+        """
+        Rename the registered ROI at the given index.
+
+        If `refresh` is false, the name is only written to the feature table and
+        the texts are not updated until `refresh_features` is called.
+        """
+        _name = TextFeatureName.NAME.value
+        df = self.features if self.show_all else self._hidden_shapes.features
+        if _name in df:
+            df.iat[index, df.columns.get_loc(_name)] = name
+        elif (roi_manager := self._roi_manager_ref()) is not None:
+            column = roi_manager._roilist.get_column(_name)[: df.shape[0]]
+            column += [""] * (df.shape[0] - len(column))
+            df[_name] = column
+            if self.show_all:
+                # new column must be registered to the layer
+                self.features = df
+            return None
+        else:
+            return None
+        if refresh:
+            self.refresh_features()
+        return None
+
+    def refresh_features(self) -> None:
+        """Apply in-place edits of the feature values to the texts."""
+        # the features setter validates the whole table, which is not needed here
+        if self.show_all:
+            self.refresh_text()
+            self.events.features()
+        return None
+
     def update_from_json(self, path: str | Path, append: bool = False) -> None:
         """Update the layer state from a JSON file."""
         # clear the layer
         if not append:
             self._initialize_layer()
-        with open(path) as f:
-            js = json.load(f)
+        js = _read_json(path)
         rois = RoiData.from_json_dict(js)
         nshapes = self.roi_count()
         self._current_item = None
@@ -137,13 +237,15 @@ class RoiManagerLayer(Shapes):
             cur_column = roimgr._roilist.get_column("name")
         else:
             cur_column = []
-        with self.events.data.blocker():
-            for index, (data, shape_type) in enumerate(zip(rois.data, rois.shape_type)):
-                self.add([data], shape_type=shape_type)
-                self.events.roi_added(index=nshapes + index, shape_type=shape_type)
+        if rois.data:
+            with self.events.data.blocker():
+                self.add(rois.data, shape_type=rois.shape_type)
+        self._emit_roi_added(
+            list(range(nshapes, nshapes + len(rois.data))), rois.shape_type
+        )
         self.selected_data = set()
         df = self.features
-        df["id"] = np.arange(df.shape[0], dtype=np.uint32)
+        df["id"] = self._sequential_ids(df.shape[0])
         if rois.names is not None and (roimgr := self._roi_manager_ref()) is not None:
             roilist = roimgr._roilist
             new_column = cur_column + rois.names
@@ -155,9 +257,20 @@ class RoiManagerLayer(Shapes):
 
     def write_json(self, path: str | Path) -> None:
         """Write the ROI data to a JSON file."""
-        js = self.get_roi_data().to_json_dict()
-        with open(path, "w") as f:
-            json.dump(js, f)
+        rois = self.get_roi_data()
+        if orjson is None:
+            with open(path, "w") as f:
+                json.dump(rois.to_json_dict(), f)
+        else:
+            js = rois.to_json_dict(tolist=False)
+            with open(path, "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        js,
+                        default=_ndarray_tolist,
+                        option=orjson.OPT_SERIALIZE_NUMPY,
+                    )
+                )
         return None
 
     def roi_count(self) -> int:
@@ -192,7 +305,7 @@ class RoiManagerLayer(Shapes):
     def mode(self, mode):
         Shapes.mode.fset(self, mode)
         if self._current_item is not None:
-            self.selected_data = {self._current_item}
+            self._set_selected({self._current_item})
 
     @property
     def text_feature_name(self) -> TextFeatureName:
@@ -210,8 +323,8 @@ class RoiManagerLayer(Shapes):
             and (roi_manager := self._roi_manager_ref())
         ):
             column = roi_manager._roilist.get_column(_name)
-            if df.shape[0] > len(column):
-                column += [""] * (df.shape[0] - len(column))
+            if (nrows := df.shape[0]) > len(column):
+                column += [""] * (nrows - len(column))
             df[_name] = column
             self.features = df
         self.text.string = "{" + text_feature_name.value + "}"
@@ -228,45 +341,69 @@ class RoiManagerLayer(Shapes):
             raise TypeError("show_all must be a bool")
         if self._show_all == show_all:
             return
-        _current_item = self._current_item
-        if show_all:  # "show all" checked
-            self.selected_data = set()
-            old_shape_type = self.shape_type
-            self.data = self._hidden_shapes.data + self.data
-            self.features = pd.concat([self._hidden_shapes.features, self.features])
-            if self._hidden_shapes.shape_type + old_shape_type:
-                # NOTE: bug in napari? cannot set empty list to shape_type
-                self.shape_type = self._hidden_shapes.shape_type + old_shape_type
-            self._current_item = _current_item  # _current_item may change in setters
-            if self._hidden_shapes.current_item is not None:
-                self._current_item = self._hidden_shapes.current_item
-                self.selected_data = {self._current_item}
-            else:
-                self.selected_data = self._hidden_shapes.selected_data
-            self._hidden_shapes.clear()
-            self.text.visible = self._hidden_shapes.display_text
-        else:  # "show all" unchecked
-            self._hidden_shapes.update(
-                data=self.data,
-                shape_type=self.shape_type,
-                features=self.features,
-                selected_data=self.selected_data,
-                current_item=self._current_item,
-                display_text=self.text.visible,
-            )
-            if self._current_item is not None:
-                cur, typ = self._hidden_shapes.pop(self._current_item)
-                self._current_item = None
-                self.data = []
-                # add last current ROI to show only it.
-                self.add(cur, shape_type=typ)
-                self._current_item = 0
-                self.selected_data = {0}
+        if self.nshapes == 0 and self._hidden_shapes.len() == 0:
+            # nothing to swap, but the hidden state must be left as the slow path does
+            hidden = self._hidden_shapes
+            if show_all:
+                hidden.clear()
+                self.text.visible = hidden.display_text
             else:
+                hidden.current_item = None
+                hidden.selected_data = hidden.selected_data[:0]
+                hidden.display_text = self.text.visible
+                self.text.visible = False
+            self._show_all = show_all
+            return
+        with self._batched_updates():
+            _current_item = self._current_item
+            if show_all:  # "show all" checked
                 self.selected_data = set()
-                self.data = []
-                self._current_item = None
-            self.text.visible = False
+                hidden = self._hidden_shapes
+                n_hidden = hidden.len()
+                # (data, shape_type) pairs let napari build all shapes in one pass
+                data = list(zip(hidden.data, hidden.shape_type.tolist()))
+                data.extend(zip(self.data, self.shape_type))
+                hidden_features = hidden.features
+                visible_features = self.features
+                self.data = data
+                # only "id" and "name" are stored, so build the columns directly
+                features = {"id": self._sequential_ids(len(data))}
+                if "name" in hidden_features or "name" in visible_features:
+                    names = _name_column(hidden_features, n_hidden)
+                    names += _name_column(visible_features, len(data) - n_hidden)
+                    features["name"] = names
+                self.features = features
+                # _current_item may change in setters. The visible shapes come after
+                # the hidden ones, including a current ROI drawn while hidden.
+                if _current_item is not None:
+                    self._current_item = n_hidden + _current_item
+                    self.selected_data = {self._current_item}
+                else:
+                    self._current_item = None
+                    self.selected_data = set(self._hidden_shapes.selected_data.tolist())
+                self._hidden_shapes.clear()
+                self.text.visible = self._hidden_shapes.display_text
+            else:  # "show all" unchecked
+                self._hidden_shapes.update(
+                    data=self.data,
+                    shape_type=self.shape_type,
+                    features=self.features,
+                    selected_data=self.selected_data,
+                    current_item=self._current_item,
+                    display_text=self.text.visible,
+                )
+                if self._current_item is not None:
+                    cur, typ = self._hidden_shapes.pop(self._current_item)
+                    self._current_item = None
+                    # show only the last current ROI.
+                    self.data = [(cur, typ)]
+                    self._current_item = 0
+                    self.selected_data = {0}
+                else:
+                    self.selected_data = set()
+                    self.data = []
+                    self._current_item = None
+                self.text.visible = False
         self._show_all = show_all
 
     def as_shapes_layer(self) -> Shapes:
@@ -279,14 +416,63 @@ class RoiManagerLayer(Shapes):
         if self.show_all:
             shape_data = self.data
             shape_type = self.shape_type
+            if self._current_item is not None:
+                shape_data.pop(self._current_item)
+                shape_type.pop(self._current_item)
         else:
-            shape_data = self._hidden_shapes.data
-            shape_type = self._hidden_shapes.shape_type
+            # the current ROI is the only visible shape and is not hidden
+            shape_data = list(self._hidden_shapes.data)
+            shape_type = self._hidden_shapes.shape_type.tolist()
         if (roimgr := self._roi_manager_ref()) is not None:
             names = roimgr._roilist.get_column("name")
         else:
             names = None
-        if self._current_item is not None:
-            shape_data.pop(self._current_item)
-            shape_type.pop(self._current_item)
         return RoiData(shape_data, shape_type, names)
+
+
+# above this size, NumPy comparison is faster than checking sortedness in Python
+_BISECT_MAX_SIZE = 64
+
+
+def _count_smaller(indices: Sequence[int], value: int) -> tuple[int, bool]:
+    """Return the number of indices smaller than value and if value is included."""
+    if len(indices) <= _BISECT_MAX_SIZE and all(
+        i0 < i1 for i0, i1 in zip(indices, indices[1:])
+    ):
+        pos = bisect_left(indices, value)
+        return pos, pos < len(indices) and indices[pos] == value
+    arr = np.fromiter(indices, dtype=np.int64, count=len(indices))
+    return int(np.count_nonzero(arr < value)), bool(np.any(arr == value))
+
+
+# default ROI names, grown by chunks as more ROIs are added
+_ROI_NAMES: list[str] = []
+_ROI_NAMES_CHUNK = 1024
+
+
+def _roi_name(index: int) -> str:
+    """Return the default name of the ROI at the given index."""
+    if index >= (n := len(_ROI_NAMES)):
+        stop = (index // _ROI_NAMES_CHUNK + 1) * _ROI_NAMES_CHUNK
+        _ROI_NAMES.extend([f"ROI-{i:04d}" for i in range(n, stop)])
+    return _ROI_NAMES[index]
+
+
+def _name_column(df: pd.DataFrame, n: int) -> list[str]:
+    names = df["name"].tolist()[:n] if "name" in df else []
+    return names + [""] * (n - len(names))
+
+
+def _read_json(path: str | Path):
+    if orjson is None:
+        with open(path) as f:
+            return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _ndarray_tolist(obj):
+    # orjson only serializes C-contiguous arrays natively
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type {type(obj)} is not JSON serializable")
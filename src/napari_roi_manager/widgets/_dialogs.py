@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from functools import lru_cache, partial
 from textwrap import wrap
 from typing import TYPE_CHECKING
 
-from qtpy import QtCore, QtGui
+import numpy as np
+from qtpy import QtCore
 from qtpy import QtWidgets as QtW
 
 if TYPE_CHECKING:
@@ -41,7 +43,7 @@ class QCustomDialog(QtW.QDialog):
     ) -> QCustomDialog:
         self = cls(parent)
         self.setWindowTitle(title)
-        self._message.setText("\n".join(wrap(message)))
+        self._message.setText(_wrap_message(message))
         for choice in choices:
             btn = QtW.QPushButton(choice, self._buttons)
             self._buttons.layout().addWidget(btn)
@@ -56,6 +58,11 @@ class QCustomDialog(QtW.QDialog):
         return callback
 
 
+@lru_cache(maxsize=64)
+def _wrap_message(message: str) -> str:
+    return "\n".join(wrap(message))
+
+
 def _labeled(text: str, widget: QtW.QWidget) -> QtW.QWidget:
     out = QtW.QWidget()
     layout = QtW.QHBoxLayout()
@@ -68,6 +75,8 @@ def _labeled(text: str, widget: QtW.QWidget) -> QtW.QWidget:
 
 class QSpecifyDialog(QtW.QDialog):
     def __init__(self, layer: RoiManagerLayer, parent: QtW.QWidget | None = None):
+        from qtpy import QtGui
+
         super().__init__(parent)
 
         self.layer = layer
@@ -90,31 +99,69 @@ class QSpecifyDialog(QtW.QDialog):
         layout.addWidget(self.multiply_by_scale)
         layout.addWidget(self.run_button)
 
-        self.width_input.textChanged.connect(self._on_value_changed)
-        self.height_input.textChanged.connect(self._on_value_changed)
-        self.x_input.textChanged.connect(self._on_value_changed)
-        self.y_input.textChanged.connect(self._on_value_changed)
-        self.multiply_by_scale.stateChanged.connect(self._on_value_changed)
+        # coalesce keystrokes into one layer update
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(50)
+        self._update_timer.timeout.connect(self._on_value_changed)
+
+        # parse each input only when its own text changes
+        self._values = {
+            "width": float(self.width_input.text()),
+            "height": float(self.height_input.text()),
+            "x": float(self.x_input.text()),
+            "y": float(self.y_input.text()),
+        }
+        self._on_scale_toggled(self.multiply_by_scale.isChecked())
+        self.width_input.textChanged.connect(partial(self._set_value, "width"))
+        self.height_input.textChanged.connect(partial(self._set_value, "height"))
+        self.x_input.textChanged.connect(partial(self._set_value, "x"))
+        self.y_input.textChanged.connect(partial(self._set_value, "y"))
+        self.multiply_by_scale.stateChanged.connect(self._on_scale_toggled)
 
         self.run_button.clicked.connect(self.accept)
 
         if layer.mode != "add_rectangle":
             layer.mode = "add_rectangle"
 
+        self._update_timer.stop()  # the initial values are applied right away
         self._on_value_changed()
 
+    def _set_value(self, key: str, text: str):
+        try:
+            self._values[key] = float(text)
+        except ValueError:  # intermediate input such as "" or "-"
+            return
+        self._update_timer.start()
+
+    def _on_scale_toggled(self, *_):
+        if self.multiply_by_scale.isChecked():
+            yscale, xscale = self.layer.scale[-2:]
+            self._scale = (float(yscale), float(xscale))
+        else:
+            self._scale = (1.0, 1.0)
+        self._update_timer.start()
+
+    def accept(self):
+        if self._update_timer.isActive():
+            self._update_timer.stop()
+            self._on_value_changed()
+        return super().accept()
+
     def _on_value_changed(self):
-        yscale, xscale = (
-            self.layer.scale[-2:] if self.multiply_by_scale.isChecked() else (1, 1)
+        yscale, xscale = self._scale
+        values = self._values
+        width = values["width"] * xscale
+        height = values["height"] * yscale
+        x = values["x"] * xscale
+        y = values["y"] * yscale
+        new_data = np.array(
+            [[y, x], [y + height, x], [y + height, x + width], [y, x + width]],
+            dtype=np.float32,
         )
-        width = float(self.width_input.text()) * xscale
-        height = float(self.height_input.text()) * yscale
-        x = float(self.x_input.text()) * xscale
-        y = float(self.y_input.text()) * yscale
-        new_data = [[y, x], [y + height, x], [y + height, x + width], [y, x + width]]
         if (ci := self.layer._current_item) is None:
             self.layer.add(new_data, shape_type="rectangle")
         else:
-            self.layer.data = (
-                self.layer.data[:ci] + new_data + self.layer.data[ci + 1 :]
-            )
+            data = list(zip(self.layer.data, self.layer.shape_type))
+            data[ci] = (new_data, "rectangle")
+            self.layer.data = data
@@ -1,11 +1,22 @@
-from collections.abc import Iterable
+from __future__ import annotations
 
-import napari
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import numpy as np
 from qtpy import QtCore
 from qtpy import QtWidgets as QtW
+from superqt.utils import qthrottled
 
 from napari_roi_manager.layers import RoiManagerLayer
-from napari_roi_manager.widgets._dialogs import QCustomDialog
+from napari_roi_manager.layers._layer import TextFeatureName, _roi_name
+
+if TYPE_CHECKING:
+    import napari.viewer
+
+# in the same order as the items of the text feature combobox
+_TEXT_FEATURE_NAMES = tuple(TextFeatureName)
 
 
 class QRoiManagerButtons(QtW.QWidget):
@@ -59,72 +70,168 @@ class QRoiManagerButtons(QtW.QWidget):
         self.setFixedWidth(115)
 
 
-class QRoiListWidget(QtW.QTableWidget):
+class QRoiTableModel(QtCore.QAbstractTableModel):
+    """Table model holding the names and shape types of the ROIs."""
+
+    renamed = QtCore.Signal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns: dict[str, list[str]] = {"name": [], "type": []}
+        self._headers = list(self._columns.keys())
+
+    def rowCount(self, parent: QtCore.QModelIndex | None = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._columns["name"])
+
+    def columnCount(self, parent: QtCore.QModelIndex | None = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role not in (
+            QtCore.Qt.ItemDataRole.DisplayRole,
+            QtCore.Qt.ItemDataRole.EditRole,
+        ):
+            return None
+        return self._columns[self._headers[index.column()]][index.row()]
+
+    def setData(
+        self, index: QtCore.QModelIndex, value, role=QtCore.Qt.ItemDataRole.EditRole
+    ):
+        if role != QtCore.Qt.ItemDataRole.EditRole or index.column() != 0:
+            return False
+        row, value = index.row(), str(value)
+        self._columns["name"][row] = value
+        self.dataChanged.emit(index, index, [role])
+        self.renamed.emit(row, value)
+        return True
+
+    def flags(self, index: QtCore.QModelIndex):
+        _F = QtCore.Qt.ItemFlag
+        flags = _F.ItemIsEnabled | _F.ItemIsSelectable
+        if index.column() == 0:
+            flags |= _F.ItemIsEditable
+        return flags
+
+    def headerData(
+        self, section: int, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole
+    ):
+        if role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
+
+    def add_rows(self, names: list[str], shape_types: list[str]):
+        if not names:
+            return
+        start = self.rowCount()
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(names) - 1)
+        self._columns["name"].extend(names)
+        self._columns["type"].extend(shape_types)
+        self.endInsertRows()
+
+    def remove_rows(self, row: int, count: int = 1):
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row + count - 1)
+        for values in self._columns.values():
+            del values[row : row + count]
+        self.endRemoveRows()
+
+    def get_column(self, col: str) -> list[str]:
+        return list(self._columns[col])
+
+    def set_column(self, col: str, values: list[str]):
+        values = values[: self.rowCount()]
+        self._columns[col][: len(values)] = values
+        if values:
+            col_idx = self._headers.index(col)
+            self.dataChanged.emit(
+                self.index(0, col_idx), self.index(len(values) - 1, col_idx)
+            )
+
+
+class QRoiListWidget(QtW.QTableView):
     selected = QtCore.Signal(set)
     renamed = QtCore.Signal(int, str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setColumnCount(2)
-        self.setHorizontalHeaderLabels(["name", "type"])
+        self._model = QRoiTableModel(self)
+        self.setModel(self._model)
+        self._column_index = {
+            self._model.headerData(i, QtCore.Qt.Orientation.Horizontal): i
+            for i in range(self._model.columnCount())
+        }
         self.setColumnWidth(0, 80)
         self.setColumnWidth(1, 65)
         self.horizontalHeader().setFixedHeight(18)
         self.setMaximumWidth(180)
         self.verticalHeader().setSectionResizeMode(QtW.QHeaderView.ResizeMode.Fixed)
-        self._blocking_cell_changed = False
-        self.itemSelectionChanged.connect(self._selection_changed)
-        self.cellChanged.connect(self._cell_changed)
+        self.verticalHeader().setDefaultSectionSize(18)
+        self._last_selected: frozenset[int] = frozenset()
+        self.selectionModel().selectionChanged.connect(self._selection_changed)
+        self._model.renamed.connect(self.renamed)
+        # removing rows shifts the selected rows without notifying the selection
+        self._model.rowsRemoved.connect(self._forget_selection)
+
+    def rowCount(self) -> int:
+        return self._model.rowCount()
 
     def addRow(self, text: str, shape_type: str):
-        row = self.rowCount()
-        self._blocking_cell_changed = True
-        try:
-            self.insertRow(row)
-            self.setItem(row, 0, QtW.QTableWidgetItem(text))
-            item = QtW.QTableWidgetItem(shape_type)
-            # set read only
-            item.setFlags(item.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.setItem(row, 1, item)
-        finally:
-            self._blocking_cell_changed = False
-        self.setRowHeight(row, 18)
+        self.addRows([text], [shape_type])
+
+    def addRows(self, texts: list[str], shape_types: list[str]):
+        self._model.add_rows(texts, shape_types)
+
+    def removeRow(self, row: int):
+        self._model.remove_rows(row)
+
+    def removeRows(self, rows: Iterable[int]):
+        """Remove rows, one model update per contiguous run of rows."""
+        # iterate from the end so that earlier runs keep their positions
+        runs: list[list[int]] = []
+        for row in sorted(set(rows), reverse=True):
+            if runs and runs[-1][0] == row + 1:
+                runs[-1][0] = row
+            else:
+                runs.append([row, row])
+        for first, last in runs:
+            self._model.remove_rows(first, last - first + 1)
+
+    def selectedIndexes(self) -> list[QtCore.QModelIndex]:
+        return self.selectionModel().selectedIndexes()
 
     def get_column(self, col: str) -> list[str]:
-        col_idx = self._get_column_index(col)
-        return [self.item(row, col_idx).text() for row in range(self.rowCount())]
+        self._get_column_index(col)
+        return self._model.get_column(col)
 
     def set_column(self, col: str, values: list[str]):
-        col_idx = self._get_column_index(col)
-        self._blocking_cell_changed = True
-        try:
-            for row, value in enumerate(values):
-                self.setItem(row, col_idx, QtW.QTableWidgetItem(value))
-        finally:
-            self._blocking_cell_changed = False
+        self._get_column_index(col)
+        self._model.set_column(col, values)
 
     def _get_column_index(self, col: str) -> int:
-        col_idx = -1
-        for i in range(self.columnCount()):
-            if self.horizontalHeaderItem(i).text() == col:
-                col_idx = i
-                break
-        else:
-            raise ValueError(f"Column {col!r} not found.")
-        return col_idx
+        try:
+            return self._column_index[col]
+        except KeyError:
+            raise ValueError(f"Column {col!r} not found.") from None
 
     def _selection_changed(self):
-        indices = {idx.row() for idx in self.selectedIndexes()}
-        self.selected.emit(indices)
-
-    def _cell_changed(self, row: int, col: int):
-        if self._blocking_cell_changed or col != 0:
+        indices = frozenset(idx.row() for idx in self.selectedIndexes())
+        if indices == self._last_selected:
             return
-        self.renamed.emit(row, self.item(row, col).text())
+        self._last_selected = indices
+        self.selected.emit(set(indices))
+
+    def _forget_selection(self, *_):
+        self._last_selected = frozenset()
 
 
 class QRoiManager(QtW.QWidget):
-    def __init__(self, viewer: napari.Viewer):
+    # NOTE: napari matches the string "napari.viewer.Viewer" to inject the viewer
+    def __init__(self, viewer: napari.viewer.Viewer):
         self._viewer = viewer
         super().__init__()
 
@@ -142,9 +249,16 @@ class QRoiManager(QtW.QWidget):
         self._roilist.setSizePolicy(_SP.Expanding, _SP.Expanding)
         layout.addWidget(self._roilist, 2, _AF.AlignTop | _AF.AlignLeft)
         layout.addWidget(self._btns, 1, _AF.AlignTop | _AF.AlignRight)
-        self.connect_layer(layer)
         self._layer = layer
 
+        # renaming is frequent; the layer features are updated once per event loop
+        self._features_timer = QtCore.QTimer(self)
+        self._features_timer.setSingleShot(True)
+        self._features_timer.setInterval(0)
+        self._features_timer.timeout.connect(self._flush_features)
+        self._batch_renaming = False
+        self.connect_layer(layer)
+
     def connect_layer(self, layer: RoiManagerLayer):
         btns = self._btns
         roilist = self._roilist
@@ -154,36 +268,50 @@ class QRoiManager(QtW.QWidget):
         btns._load_roiset_btn.clicked.connect(self.load_roiset)
         btns._save_roiset_btn.clicked.connect(self.save_roiset)
         btns._text_feature_name.currentIndexChanged.connect(self.set_text_feature_name)
-        btns._text_font_size.valueChanged.connect(self.set_text_font_size)
+        # every font size change re-lays out all the texts, so throttle it
+        btns._text_font_size.valueChanged.connect(
+            qthrottled(self.set_text_font_size, timeout=100, parent=self)
+        )
         btns._to_shapes_btn.clicked.connect(self.as_shapes_layer)
 
         @btns._show_all_checkbox.stateChanged.connect
         def _show_all_changed(val):
             layer.show_all = val == QtCore.Qt.CheckState.Checked
 
-        @layer.events.roi_added.connect
-        def _roi_added(event):
-            tp = event.shape_type
-            roilist.addRow(f"ROI-{event.index:>04}", tp)
+        @layer.events.rois_added.connect
+        def _rois_added(event):
+            names = [_roi_name(index) for index in event.indices]
+            roilist.addRows(names, event.shape_types)
 
         @layer.events.roi_removed.connect
         def _roi_removed(event):
-            indices = sorted(event.indices)
-            for idx in reversed(indices):
-                roilist.removeRow(idx)
+            roilist.removeRows(event.indices)
+
+        # rubber-band or keyboard selection emits many selection changes
+        @qthrottled(timeout=50, parent=self)
+        def _select_rois(indices):
+            if layer.show_all:
+                layer.selected_data = set(indices)
 
         @roilist.selected.connect
         def _roi_selected(indices):
+            # must not be delayed, or a ROI added in the meantime would be removed
             layer._remove_current()
-            if layer.show_all:
-                layer.selected_data = set(indices)
+            _select_rois(indices)
+
+        @layer.events.data.connect
+        def _cancel_selection(event):
+            # the new shape is selected by the layer; drop the outdated selection
+            if event.action == "adding":
+                _select_rois.cancel()
+
+        self._select_rois = _select_rois
 
         @roilist.renamed.connect
         def _roi_renamed(index: int, name: str):
-            col = roilist.get_column("name")
-            df = layer.features
-            df["name"] = col
-            layer.features = df
+            layer.rename_roi(index, name, refresh=False)
+            if not self._batch_renaming:
+                self._features_timer.start()
 
     def add(self, data, shape_type: str = "rectangle"):
         return self._layer.add(data, shape_type=shape_type)
@@ -194,12 +322,30 @@ class QRoiManager(QtW.QWidget):
             self.add(data, shape_type=shape_type)
         self._layer.register_roi()
 
+    @contextmanager
+    def batch_rename(self) -> Iterator[None]:
+        """Update the layer features only once after all the ROIs are renamed."""
+        self._batch_renaming = True
+        try:
+            yield
+        finally:
+            self._batch_renaming = False
+            self._flush_features()
+
+    def _flush_features(self):
+        self._features_timer.stop()
+        self._layer.refresh_features()
+
     def select(self, indices=()):
-        if not isinstance(indices, Iterable):
-            indices = {indices}
+        if isinstance(indices, (int, np.integer)):
+            self._layer.selected_data = {int(indices)}
+            return
+        if isinstance(indices, str):
+            raise TypeError(f"Indices must be integers, got {indices!r}.")
         self._layer.selected_data = set(indices)
 
     def remove(self, indices=None):
+        self._select_rois.flush()
         if indices is not None:
             self._layer.selected_data = set(indices)
         self._layer.remove_selected()
@@ -211,19 +357,16 @@ class QRoiManager(QtW.QWidget):
         dlg.exec_()
 
     def _remove_button_clicked(self):
+        self._select_rois.flush()  # apply the pending selection first
         if self._layer.show_all:
             self._layer.remove_selected()
         else:
-            to_remove = sorted(
-                {index.row() for index in self._roilist.selectedIndexes()},
-                reverse=True,
-            )
-            for i in to_remove:
-                self._layer._hidden_shapes.pop(i)
-                self._roilist.removeRow(i)
+            to_remove = {index.row() for index in self._roilist.selectedIndexes()}
+            self._layer._hidden_shapes.remove(to_remove)
+            self._roilist.removeRows(to_remove)
 
     def set_text_feature_name(self, idx: int):
-        self._layer.text_feature_name = ["id", "name"][idx]
+        self._layer.text_feature_name = _TEXT_FEATURE_NAMES[idx]
 
     def set_text_font_size(self, size: int):
         self._layer.text.size = size
@@ -249,6 +392,8 @@ class QRoiManager(QtW.QWidget):
             else:
                 return
             if self._layer.roi_count() > 0:
+                from napari_roi_manager.widgets._dialogs import QCustomDialog
+
                 res = QCustomDialog.construct(
                     title="Append or Replace",
                     message=(